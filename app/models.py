@@ -1,8 +1,9 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, Date
-from sqlalchemy.orm import relationship, declarative_base
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Date, Index, select, event
+from sqlalchemy.orm import relationship, declarative_base, selectinload, object_session
+from sqlalchemy.orm.util import identity_key
 from sqlalchemy.ext.hybrid import hybrid_property
 from datetime import date
-from collections import defaultdict
+import numpy as np
 
 Base = declarative_base()
 
@@ -11,9 +12,24 @@ class Season(Base):
     __tablename__ = "seasons"
     id = Column(Integer, primary_key=True)
     year = Column(Integer, unique=True, nullable=False)
-    shows = relationship("Show", back_populates="season")
+    shows = relationship("Show", back_populates="season", foreign_keys="Show.season_id")
     # Caption weights per season (e.g., Music Effect=30)
-    caption_weights = relationship("CaptionWeight", back_populates="season")
+    caption_weights = relationship(
+        "CaptionWeight", back_populates="season",
+        foreign_keys="CaptionWeight.season_id"
+    )
+
+    @property
+    def weights_map(self):
+        """
+        {caption: weight} for this season, built once per instance and cached
+        so every performance of the season shares the same dict.
+        """
+        weights = self.__dict__.get("_weights_map")
+        if weights is None:
+            weights = {w.caption: w.weight for w in self.caption_weights}
+            self.__dict__["_weights_map"] = weights
+        return weights
 
 # Defines caption weights for each season
 class CaptionWeight(Base):
@@ -23,7 +39,8 @@ class CaptionWeight(Base):
     caption = Column(String, nullable=False)
     weight = Column(Float, nullable=False)
 
-    season = relationship("Season", back_populates="caption_weights")
+    season = relationship("Season", back_populates="caption_weights",
+                          foreign_keys=[season_id])
 
 # Host schools or venues
 class HostLocation(Base):
@@ -32,7 +49,7 @@ class HostLocation(Base):
     name = Column(String, nullable=False)
     city = Column(String)
     state = Column(String)
-    shows = relationship("Show", back_populates="host")
+    shows = relationship("Show", back_populates="host", foreign_keys="Show.host_id")
 
 # A single competition/show, held at a host school and part of a season
 class Show(Base):
@@ -45,23 +62,41 @@ class Show(Base):
     host_id = Column(Integer, ForeignKey("hosts.id"))
     week = Column(Integer, nullable=False)
 
-    season = relationship("Season", back_populates="shows")
-    host = relationship("HostLocation", back_populates="shows")
+    # selectin: batches the per-show season loads into one WHERE IN query
+    season = relationship("Season", back_populates="shows", lazy="selectin",
+                          foreign_keys=[season_id])
+    host = relationship("HostLocation", back_populates="shows",
+                        foreign_keys=[host_id])
     performances = relationship(
         "Performance",
         back_populates="show",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        foreign_keys="Performance.show_id"
+    )
+    judge_assignments = relationship(
+        "JudgeAssignment", back_populates="show",
+        foreign_keys="JudgeAssignment.show_id"
     )
-    judge_assignments = relationship("JudgeAssignment", back_populates="show")
     pdf_name = Column(String, unique=True, nullable=False)
+
+    # week computation filters on (season_id, date); pdf_name already gets a
+    # unique index from the column definition
+    __table_args__ = (Index("ix_shows_season_date", "season_id", "date"),)
+
 # Judges and their information (caption assigned per show via JudgeAssignment)
 class Judge(Base):
     __tablename__ = "judges"
     id = Column(Integer, primary_key=True)
     name = Column(String, unique=True, nullable=False)
 
-    assignments = relationship("JudgeAssignment", back_populates="judge")
-    caption_scores = relationship("CaptionScore", back_populates="judge")
+    assignments = relationship(
+        "JudgeAssignment", back_populates="judge",
+        foreign_keys="JudgeAssignment.judge_id"
+    )
+    caption_scores = relationship(
+        "CaptionScore", back_populates="judge",
+        foreign_keys="CaptionScore.judge_id"
+    )
 
 # Assignment of a judge to a caption for a specific show
 class JudgeAssignment(Base):
@@ -71,15 +106,21 @@ class JudgeAssignment(Base):
     judge_id = Column(Integer, ForeignKey("judges.id"))
     caption = Column(String)
 
-    show = relationship("Show", back_populates="judge_assignments")
-    judge = relationship("Judge", back_populates="assignments")
+    show = relationship("Show", back_populates="judge_assignments",
+                        foreign_keys=[show_id])
+    judge = relationship("Judge", back_populates="assignments",
+                         foreign_keys=[judge_id])
 
 # Classification of a group (e.g. PSW, PIW)
 class Classification(Base):
     __tablename__ = "classifications"
     id = Column(Integer, primary_key=True)
     name = Column(String, unique=True, nullable=False)
-    groups = relationship("Group", back_populates="classification")
+    # viewonly: pure navigation collection, never used to persist groups
+    groups = relationship(
+        "Group", back_populates="classification",
+        foreign_keys="Group.classification_id", viewonly=True
+    )
 
 # Performing groups
 class Group(Base):
@@ -89,10 +130,14 @@ class Group(Base):
     home_city = Column(String)
 
     classification_id = Column(Integer, ForeignKey("classifications.id"))
-    classification = relationship("Classification", back_populates="groups")
+    classification = relationship("Classification", back_populates="groups",
+                                  foreign_keys=[classification_id])
 
-    # link to all performances
-    performances = relationship("Performance", back_populates="group")
+    # link to all performances (viewonly: writes go through group_id)
+    performances = relationship(
+        "Performance", back_populates="group",
+        foreign_keys="Performance.group_id", viewonly=True
+    )
 
 # A single performance of a group at a show
 class Performance(Base):
@@ -103,7 +148,8 @@ class Performance(Base):
 
     # CHANGED: moved classification to Performance to capture at show-time
     classification_id = Column(Integer, ForeignKey("classifications.id"), nullable=False)
-    classification = relationship("Classification")
+    classification = relationship("Classification",
+                                  foreign_keys=[classification_id])
     # ADDED: block number when shows have multiple blocks 
     block_number = Column(Integer, nullable=True)       # Nullable: some shows will not 
 
@@ -111,9 +157,39 @@ class Performance(Base):
     placement = Column(Integer)
     penalty = Column(Float, default=0.0)
 
-    group = relationship("Group", back_populates="performances")
-    show = relationship("Show", back_populates="performances")
-    caption_scores = relationship("CaptionScore", back_populates="performance")
+    __table_args__ = (
+        Index("ix_performances_show", "show_id"),
+        Index("ix_performances_group", "group_id"),
+    )
+
+    group = relationship("Group", back_populates="performances",
+                         foreign_keys=[group_id])
+    show = relationship("Show", back_populates="performances",
+                        foreign_keys=[show_id])
+    # selectin: averaging touches every score, so batch-load the collection
+    caption_scores = relationship(
+        "CaptionScore", back_populates="performance", lazy="selectin",
+        foreign_keys="CaptionScore.performance_id"
+    )
+
+    @classmethod
+    def load_for_averaging(cls, session, ids):
+        """
+        Loads the given performances with everything averaged_caption_scores
+        touches (caption_scores, show → season → caption_weights) eagerly
+        batched via selectinload, so iterating the result fires a constant
+        number of queries instead of several per performance.
+        """
+        return session.scalars(
+            select(cls)
+            .where(cls.id.in_(ids))
+            .options(
+                selectinload(cls.caption_scores),
+                selectinload(cls.show)
+                .selectinload(Show.season)
+                .selectinload(Season.caption_weights),
+            )
+        ).all()
 
     @hybrid_property
     def averaged_caption_scores(self):
@@ -123,23 +199,27 @@ class Performance(Base):
 
         This is basically a really stupid way to get comp + perf / 2
         """
-        # Collect each judge’s raw average for the caption
-        temp = defaultdict(list)
-        for cs in self.caption_scores:
-            avg = (cs.comp_score + cs.perf_score) / 2
-            temp[cs.caption].append(avg)
-
-        # Build a map of caption → weight from the season
-        weights = {w.caption: w.weight for w in self.show.season.caption_weights}
-
-        # Compute weighted averages
-        return {
-            cap: round(
-                sum(val * weights.get(cap, 0) / 100 for val in vals) / len(vals),
-                3
-            )
-            for cap, vals in temp.items()
-        }
+        scores = self.caption_scores
+        if not scores:
+            return {}
+
+        # Each judge's raw average per caption, reduced in numpy:
+        # group rows by caption and sum/count via bincount
+        caps = np.array([cs.caption for cs in scores])
+        avgs = (
+            np.array([cs.comp_score for cs in scores], dtype=float)
+            + np.array([cs.perf_score for cs in scores], dtype=float)
+        ) * 0.5
+        uniq, inv = np.unique(caps, return_inverse=True)
+        sums = np.bincount(inv, weights=avgs)
+        counts = np.bincount(inv)
+
+        # Map of caption → weight, cached on the season
+        weights = self.show.season.weights_map
+        weight_vec = np.array([weights.get(cap, 0) for cap in uniq], dtype=float)
+
+        result = np.round(sums * weight_vec / 100 / counts, 3)
+        return dict(zip(uniq.tolist(), result.tolist()))
 
 # Individual caption-level score for a performance
 class CaptionScore(Base):
@@ -153,5 +233,24 @@ class CaptionScore(Base):
     placement = Column(Integer)
     judge_id = Column(Integer, ForeignKey("judges.id"))
 
-    performance = relationship("Performance", back_populates="caption_scores")
-    judge = relationship("Judge", back_populates="caption_scores")
+    __table_args__ = (Index("ix_caption_scores_performance", "performance_id"),)
+
+    performance = relationship("Performance", back_populates="caption_scores",
+                               foreign_keys=[performance_id])
+    judge = relationship("Judge", back_populates="caption_scores",
+                         foreign_keys=[judge_id])
+
+# Keep Season.weights_map honest: drop the cached dict whenever a weight
+# changes. Only touches seasons already in memory — the identity-map lookup
+# never fires a lazy load mid-flush.
+@event.listens_for(CaptionWeight, "after_insert")
+@event.listens_for(CaptionWeight, "after_update")
+@event.listens_for(CaptionWeight, "after_delete")
+def _invalidate_weights_map(mapper, connection, target):
+    season = target.__dict__.get("season")
+    if season is None:
+        session = object_session(target)
+        if session is not None and target.season_id is not None:
+            season = session.identity_map.get(identity_key(Season, target.season_id))
+    if season is not None:
+        season.__dict__.pop("_weights_map", None)
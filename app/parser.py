@@ -1,12 +1,29 @@
 #!/usr/bin/env python3
 import os
-import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    # linear-time DFA engine; drop-in for the patterns used here
+    import re2 as re
+except ImportError:
+    import re
 import camelot
 import pdfplumber
+import numpy as np
 import pandas as pd
+from pandas.io.common import dedup_names
+
+try:
+    # optional: compiles the caption-cell parser to one tight C loop
+    from numba import njit
+    from numba.typed import List as NumbaList
+except ImportError:
+    njit = None
 from datetime import datetime, date
-from sqlalchemy import create_engine
+from collections import defaultdict
+from functools import lru_cache
+from sqlalchemy import create_engine, event, insert, select, text
 from sqlalchemy.orm import sessionmaker, Session
 from models import (
     Base,
@@ -21,11 +38,17 @@ from models import (
 )
 
 # ─────────────────────────────────────────────────────────────────────────────
-# 1) CLASS/BLOCK SPLIT (unchanged)
+# 1) CLASS/BLOCK SPLIT
 # ─────────────────────────────────────────────────────────────────────────────
-CLASS_BLOCK_RE = re.compile(r"^(?P<class>.*?)(?:\s*[–-]\s*Block\s*(?P<block>\d+))?$",
-                            re.IGNORECASE)
+# Anchored at both ends so non-matching lines fail fast instead of letting
+# the engine backtrack over the optional Block suffix
+CLASS_BLOCK_RE = re.compile(
+    r"(Percussion (?:Scholastic|Independent) [A-Za-z ]+?)"
+    r"(?:\s*[–-]\s*Block\s+(\d+))?\s*$",
+    re.IGNORECASE
+)
 
+@lru_cache(maxsize=1024)
 def parse_class_block(text: str) -> tuple[str, int | None]:
     """
     Splits a text like "Percussion Scholastic A – Block 2" into:
@@ -35,8 +58,18 @@ def parse_class_block(text: str) -> tuple[str, int | None]:
     """
     if not text:
         return None, None
-
-    m = CLASS_RE.search(text.strip())
+    s = text.strip()
+
+    # substring fast path: regex engine setup dominates on short strings,
+    # and most block headers use one of these two dashes
+    for sep in (" – Block ", " - Block "):
+        head, found, tail = s.rpartition(sep)
+        if found and tail.isdigit() and head.lower().startswith(
+            ("percussion scholastic", "percussion independent")
+        ):
+            return head.strip(), int(tail)
+
+    m = CLASS_BLOCK_RE.fullmatch(s)
     if not m:
         # no valid class found
         return None, None
@@ -47,45 +80,60 @@ def parse_class_block(text: str) -> tuple[str, int | None]:
     return classification, block
 
 # ─────────────────────────────────────────────────────────────────────────────
-# 2) HEADER SCAN (unchanged)
+# 2) HEADER SCAN
 # ─────────────────────────────────────────────────────────────────────────────
-DATE_RE     = re.compile(r"([A-Za-z]+ \d{1,2},\s*\d{4})")
-LOC_RE      = re.compile(r"–\s*([A-Za-z ]+,\s*[A-Z]{2})")
-SHOWNAME_RE = re.compile(r"([A-Za-z ]+ HS(?: Saturday| Sunday| Finals| Prelims))")
-CLASS_RE = re.compile(
-    r"(Percussion (?:Scholastic|Independent) [A-Za-z ]+)"
-    r"(?:\s*[–-]\s*Block\s*\d+)?",
-    re.IGNORECASE
+# One alternation scanning the header text in a single pass instead of four;
+# the class alternative carries its own (?i:) since the rest is case-sensitive
+HEADER_RE = re.compile(
+    r"(?P<date>[A-Za-z]+ \d{1,2},\s*\d{4})"
+    r"|–\s*(?P<loc>[A-Za-z ]+,\s*[A-Z]{2})"
+    r"|(?P<show>[A-Za-z ]+ HS(?: Saturday| Sunday| Finals| Prelims))"
+    r"|(?P<cls>(?i:Percussion (?:Scholastic|Independent) [A-Za-z ]+))"
 )
-
-def scan_pdf_header(pdf_path: str, page_no: int = 0) -> dict:
+_HEADER_KEYS = {
+    "show": "show_name",
+    "loc":  "location",
+    "date": "show_date",
+    "cls":  "classification_text",
+}
+
+def scan_header_text(text: str) -> dict:
     meta = {}
-    with pdfplumber.open(pdf_path) as pdf:
-        text = pdf.pages[page_no].extract_text() or ""
-
-    # name
-    m = SHOWNAME_RE.search(text)
-    if m: meta["show_name"] = m.group(1).strip()
-
-    # location (header)
-    m = LOC_RE.search(text)
-    if m: meta["location"] = m.group(1).strip()
-
-    # date
-    m = DATE_RE.search(text)
-    if m: meta["show_date"] = datetime.strptime(m.group(1), "%B %d, %Y").date()
+    for m in HEADER_RE.finditer(text):
+        key = _HEADER_KEYS[m.lastgroup]
+        if key in meta:
+            continue   # keep the first occurrence, like the old per-regex scan
+        val = m.group(m.lastgroup).strip()
+        if key == "show_date":
+            val = datetime.strptime(val, "%B %d, %Y").date()
+        meta[key] = val
+    return meta
 
-    # raw class text
-    m = CLASS_RE.search(text)
-    if m: meta["classification_text"] = m.group(1).strip()
+# Text extraction is pdfplumber's slowest operation (layout reconstruction),
+# so one-off header callers share a small memo keyed by (path, page)
+@lru_cache(maxsize=256)
+def _page_text(pdf_path: str, page_no: int) -> str:
+    with pdfplumber.open(pdf_path) as pdf:
+        return pdf.pages[page_no].extract_text() or ""
 
-    return meta
+def scan_pdf_header(pdf_path: str, page_no: int = 0) -> dict:
+    return scan_header_text(_page_text(pdf_path, page_no))
 
 # ─────────────────────────────────────────────────────────────────────────────
 # 3) FILENAME FALLBACK
 #    Pattern: YYYY_MM_DD_hostid[_HS]_<day>_<city_slug>_<state>
 # ─────────────────────────────────────────────────────────────────────────────
-WEEKDAYS = {"saturday","sunday","prelims","semifinals","finals"}
+WEEKDAYS = ("saturday", "sunday", "prelims", "semifinals", "finals")
+
+# One anchored scan instead of split + token hunting per filename
+FN_RE = re.compile(
+    r"^(\d{4})_(\d{1,2})_(\d{1,2})"
+    r"_(?P<host>.+?)"
+    r"_(?P<weekday>" + "|".join(WEEKDAYS) + r")"
+    r"_(?P<city>.+)"
+    r"_(?P<state>[A-Za-z]{2})$",
+    re.IGNORECASE
+)
 
 def parse_filename(fn: str) -> dict:
     """
@@ -100,34 +148,24 @@ def parse_filename(fn: str) -> dict:
       }
     """
     base = os.path.splitext(fn)[0]
-    parts = base.split("_")
-    if len(parts) < 6:
-        raise ValueError(f"Filename too short: {fn!r}")
+    m = FN_RE.match(base)
+    if not m:
+        raise ValueError(f"Unrecognized filename: {fn!r}")
 
     # date
-    y, mo, da = parts[0], parts[1], parts[2]
+    y, mo, da = m.group(1), m.group(2), m.group(3)
     show_date = date(int(y), int(mo), int(da))
 
-    # find the weekday token index
-    wd_idx = next((i for i,p in enumerate(parts) if p.lower() in WEEKDAYS), None)
-    if wd_idx is None:
-        raise ValueError(f"No weekday in filename: {fn!r}")
+    # hostid, possibly already ending with 'hs'
+    hostid = m.group("host")
+    if hostid.split("_")[-1].lower() != "hs":
+        hostid += "_hs"  # ensure HS
 
-    # hostid is parts[3:wd_idx], possibly ending with 'hs'
-    hostid_parts = parts[3:wd_idx]
-    # if last is 'hs', keep it
-    if hostid_parts and hostid_parts[-1].lower() == "hs":
-        hostid = "_".join(hostid_parts)
-    else:
-        hostid = "_".join(hostid_parts + ["hs"])  # ensure HS
-
-    weekday = parts[wd_idx].title()
+    weekday = m.group("weekday").title()
 
-    # city slug is everything between weekday and last part
-    city_parts = parts[wd_idx+1:-1]
-    city = " ".join(p.title() for p in city_parts)
+    city = " ".join(p.title() for p in m.group("city").split("_"))
 
-    state = parts[-1].upper()
+    state = m.group("state").upper()
 
     show_name = f"{hostid.replace('_',' ').title()} {weekday}"
 
@@ -141,7 +179,7 @@ def parse_filename(fn: str) -> dict:
     }
 
 # ─────────────────────────────────────────────────────────────────────────────
-# 4) TABLE EXTRACT & CLEAN (unchanged)
+# 4) TABLE EXTRACT & CLEAN
 # ─────────────────────────────────────────────────────────────────────────────
 def extract_tables(pdf_path: str, pages: str='all'):
     tables = camelot.read_pdf(pdf_path, pages=pages, flavor='lattice')
@@ -155,27 +193,18 @@ def extract_tables(pdf_path: str, pages: str='all'):
 def clean_table(raw_df: pd.DataFrame) -> pd.DataFrame:
     """
     - Merge the top two header rows into flat column names
-    - Deduplicate those names (appending _1, _2, …)
+    - Deduplicate those names (appending .1, .2, …)
     - Drop the header rows, reset the index
     - Rename the first two columns to "Group" and "Home City"
     """
-    # 1) build the raw merged headers
-    header1 = raw_df.iloc[0].fillna("").astype(str)
-    header2 = raw_df.iloc[1].fillna("").astype(str)
-    merged = [(h1 + " " + h2).strip() for h1,h2 in zip(header1, header2)]
-
-    # 2) dedupe the merged names
-    counts = {}
-    unique_cols = []
-    for name in merged:
-        if not name:
-            name = "BLANK"
-        if name in counts:
-            counts[name] += 1
-            unique_cols.append(f"{name}_{counts[name]}")
-        else:
-            counts[name] = 0
-            unique_cols.append(name)
+    # 1) build the raw merged headers in numpy — one C pass, no zip loop
+    header1 = raw_df.iloc[0].fillna("").astype(str).to_numpy(dtype=str)
+    header2 = raw_df.iloc[1].fillna("").astype(str).to_numpy(dtype=str)
+    merged = np.char.strip(np.char.add(np.char.add(header1, " "), header2))
+    merged = np.where(merged == "", "BLANK", merged)
+
+    # 2) dedupe the merged names with pandas' own deduper (appends .1, .2, …)
+    unique_cols = dedup_names(merged.tolist(), is_potential_multiindex=False)
 
     # 3) drop the two header rows and reassign
     df = raw_df.drop(index=[0,1]).reset_index(drop=True)
@@ -191,20 +220,135 @@ def clean_table(raw_df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
+# Caption names and their column slugs, computed once instead of per row
+CAPTIONS = ("Effect - Music", "Effect - Visual", "Music", "Visual", "SubTotal")
+CAPTION_SLUGS = tuple(
+    (cap, cap.lower().replace(" ", "_").replace("-", "")) for cap in CAPTIONS
+)
+SCORED_CAPTION_SLUGS = CAPTION_SLUGS[:4]   # SubTotal carries no judge scores
+
+
+def _place_to_int(v):
+    """
+    The *_place columns are nullable Int64, so itertuples yields np.int64
+    (or pd.NA) — sqlite would store the former as a BLOB and reject the
+    latter outright. Box to a plain int, mapping NA to None.
+    """
+    return int(v) if pd.notna(v) else None
+
+
+def filter_performance_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Robust filtering of non-performance rows:
+    - must have both Group & Home City
+    - drop any rogue header row
+    - require a positive subtotal_total
+    """
+    df = df[df['Group'].notna() & df['Home City'].notna()]
+    df = df[df['Group'].str.strip().str.lower() != 'group']
+    df = df[pd.to_numeric(df['subtotal_total'], errors='coerce').fillna(0) > 0]
+    return df
+
+
+def _parse_cells_numba(cells):
+    """
+    Parses "comp\\nperf\\ntotal\\nplace" cells into four numeric arrays.
+
+    The digits are accumulated by hand (numba's nopython mode cannot compile
+    float(str), so this sticks to indexing, ord() and arithmetic). Any cell
+    that is not exactly four simple decimals raises ValueError, which the
+    caller treats as "fall back to the coercing pandas path".
+    """
+    n = len(cells)
+    comp  = np.empty(n, dtype=np.float64)
+    perf  = np.empty(n, dtype=np.float64)
+    total = np.empty(n, dtype=np.float64)
+    place = np.empty(n, dtype=np.int64)
+    for i in range(n):
+        s = cells[i]
+        length = len(s)
+        pos = 0
+        vals = np.empty(4, dtype=np.float64)
+        for field in range(4):
+            # float()/int() tolerate surrounding whitespace; so do we
+            while pos < length and (s[pos] == " " or s[pos] == "\t" or s[pos] == "\r"):
+                pos += 1
+            neg = False
+            if pos < length and s[pos] == "-":
+                neg = True
+                pos += 1
+            value = 0.0
+            ndigits = 0
+            while pos < length and "0" <= s[pos] <= "9":
+                value = value * 10.0 + (ord(s[pos]) - 48)
+                ndigits += 1
+                pos += 1
+            if pos < length and s[pos] == ".":
+                pos += 1
+                scale = 0.1
+                while pos < length and "0" <= s[pos] <= "9":
+                    value += (ord(s[pos]) - 48) * scale
+                    scale *= 0.1
+                    ndigits += 1
+                    pos += 1
+            if ndigits == 0:
+                raise ValueError("malformed caption cell")
+            while pos < length and (s[pos] == " " or s[pos] == "\t" or s[pos] == "\r"):
+                pos += 1
+            vals[field] = -value if neg else value
+            if field < 3:
+                if pos >= length or s[pos] != "\n":
+                    raise ValueError("malformed caption cell")
+                pos += 1
+        if pos != length:
+            raise ValueError("malformed caption cell")
+        comp[i]  = vals[0]
+        perf[i]  = vals[1]
+        total[i] = vals[2]
+        place[i] = int(vals[3])
+    return comp, perf, total, place
+
+if njit is not None:
+    _parse_cells_numba = njit(cache=True)(_parse_cells_numba)
+
+
 def split_caption_cells(df: pd.DataFrame) -> pd.DataFrame:
-    def split_cell(c):
-        p = (c or "").split("\n")
-        return float(p[0]), float(p[1]), float(p[2]), int(p[3])
-    for cap in ["Effect - Music","Effect - Visual","Music","Visual","SubTotal"]:
+    to_drop = []
+    for cap, slug in CAPTION_SLUGS:
         if cap not in df.columns: continue
-        slug = cap.lower().replace(" ","_").replace("-","")
-        vals = [split_cell(c) for c in df[cap]]
-        df[f"{slug}_comp"], df[f"{slug}_perf"], df[f"{slug}_total"], df[f"{slug}_place"] = zip(*vals)
-        df = df.drop(columns=[cap])
+        col = df[cap].fillna("").astype(str)
+        to_drop.append(cap)
+
+        if njit is not None:
+            try:
+                comp, perf, total, place = _parse_cells_numba(NumbaList(col.tolist()))
+            except ValueError:
+                # malformed cells: fall through to the coercing pandas path
+                pass
+            else:
+                df[f"{slug}_comp"]  = comp
+                df[f"{slug}_perf"]  = perf
+                df[f"{slug}_total"] = total
+                df[f"{slug}_place"] = pd.array(place, dtype="Int64")
+                continue
+
+        # vectorized split: one C pass instead of float()/int() per cell
+        # (n=3 caps the work at the four fields a cell can carry)
+        parts = col.str.split("\n", n=3, expand=True)
+        parts = parts.reindex(columns=range(4))
+        df[f"{slug}_comp"]  = pd.to_numeric(parts[0], errors="coerce")
+        df[f"{slug}_perf"]  = pd.to_numeric(parts[1], errors="coerce")
+        df[f"{slug}_total"] = pd.to_numeric(parts[2], errors="coerce")
+        df[f"{slug}_place"] = pd.to_numeric(parts[3], errors="coerce").astype("Int64")
+
+    # one drop for all caption columns: each drop() copies column blocks,
+    # so defer it until every caption has been expanded
+    if to_drop:
+        df = df.drop(columns=to_drop)
     return df
 
 # ─────────────────────────────────────────────────────────────────────────────
-# 5) ORM get_or_create (unchanged)
+# 5) ORM get_or_create
 # ─────────────────────────────────────────────────────────────────────────────
 def get_or_create(session: Session, model, **kw):
     obj = session.query(model).filter_by(**kw).first()
@@ -214,159 +358,345 @@ def get_or_create(session: Session, model, **kw):
     session.flush()
     return obj
 
+# id cache for hot singleton lookups (seasons, hosts): repeat calls resolve
+# via session.get, an identity-map hit that issues no SQL
+_goc_cache: dict = {}
+
+def get_or_create_cached(session: Session, model, **kw):
+    key = (model.__tablename__, tuple(sorted(kw.items())))
+    obj_id = _goc_cache.get(key)
+    if obj_id is not None:
+        obj = session.get(model, obj_id)
+        if obj is not None:
+            return obj
+    obj = get_or_create(session, model, **kw)
+    _goc_cache[key] = obj.id
+    return obj
+
 # ─────────────────────────────────────────────────────────────────────────────
-# 6) Ingest one PDF
+# 6) Parse one PDF (pure — no session, safe to run in a worker process)
 # ─────────────────────────────────────────────────────────────────────────────
-def ingest_pdf(session: Session, pdf_path: str):
+def parse_pdf(pdf_path: str) -> dict:
+    """
+    Extracts everything ingestion needs from one PDF into plain dicts:
+    show metadata plus one entry per performance with its caption scores.
+    No SQLAlchemy objects are touched, so this can run in a worker process.
+    """
     fn = os.path.basename(pdf_path)
 
-    # 1) Header scan
-    hdr0      = scan_pdf_header(pdf_path, page_no=0)
-    show_name = hdr0.get("show_name")
-    show_date = hdr0.get("show_date")
-    location  = hdr0.get("location")
-
-    # 2) Filename fallback if header failed
-    if not show_name or not show_date:
-        fb = parse_filename(fn)
-        show_name = show_name or fb["show_name"]
-        show_date = show_date or fb["show_date"]
-        # location may come from header or filename
-        city = fb["city"]
-        state = fb["state"]
-    else:
-        # parse hostid from show_name
-        hostid = show_name.rsplit(" ", 1)[0].lower().replace(" ", "_")
-        # parse city/state from header location
-        if location and "," in location:
-            city, state = [p.strip() for p in location.split(",", 1)]
+    performances = []
+    camelot_by_page = None   # lazily filled on first camelot fallback
+    with pdfplumber.open(pdf_path) as pdf:
+        # 1) Header scan from the handle we already hold — no second open
+        hdr0      = scan_header_text(pdf.pages[0].extract_text() or "")
+        show_name = hdr0.get("show_name")
+        show_date = hdr0.get("show_date")
+        location  = hdr0.get("location")
+
+        # 2) Filename fallback if header failed
+        if not show_name or not show_date:
+            fb = parse_filename(fn)
+            show_name = show_name or fb["show_name"]
+            show_date = show_date or fb["show_date"]
+            # location may come from header or filename
+            city = fb["city"]
+            state = fb["state"]
         else:
-            city = state = None
+            # parse city/state from header location
+            if location and "," in location:
+                city, state = [p.strip() for p in location.split(",", 1)]
+            else:
+                city = state = None
+
+        # 3) Extract each page/block into insert-ready rows
+        for page_no, page in enumerate(pdf.pages):
+            # scan the already-extracted page text instead of re-opening
+            # the PDF for every page
+            per_hdr = scan_header_text(page.extract_text() or "")
+            cls_txt = per_hdr.get("classification_text", "")
+            classification, block = parse_class_block(cls_txt)
+
+            # pdfplumber first: its table detection runs over the page
+            # objects already in hand, while camelot re-opens and
+            # rasterizes the PDF — keep it as the fallback only
+            frames = []
+            for tbl in page.extract_tables():
+                try:
+                    df = filter_performance_rows(
+                        split_caption_cells(clean_table(pd.DataFrame(tbl)))
+                    )
+                except (KeyError, IndexError, ValueError):
+                    continue
+                if len(df):
+                    frames.append(df)
+
+            if not frames:
+                # one camelot pass over the whole document, grouped by page,
+                # instead of re-parsing the PDF per fallback page
+                if camelot_by_page is None:
+                    camelot_by_page = defaultdict(list)
+                    for t in extract_tables(pdf_path, pages='all'):
+                        camelot_by_page[t.page].append(t)
+                for table in camelot_by_page.get(page_no+1, []):
+                    df = filter_performance_rows(
+                        split_caption_cells(clean_table(table.df))
+                    )
+                    if len(df):
+                        frames.append(df)
+
+            for df in frames:
+                # itertuples skips the per-row dict allocation of
+                # to_dict('records'); rename the two non-identifier columns
+                # so every hot field stays addressable by attribute
+                df = df.rename(columns={'Group': 'group', 'Home City': 'home_city'})
+                for row in df.itertuples(index=False):
+                    caps = [
+                        {
+                            'caption':    cap,
+                            'comp_score': getattr(row, f"{slug}_comp", 0.0),
+                            'perf_score': getattr(row, f"{slug}_perf", 0.0),
+                            'placement':  _place_to_int(getattr(row, f"{slug}_place", 0)),
+                            'judge_id':   None
+                        }
+                        for cap, slug in SCORED_CAPTION_SLUGS
+                    ]
+                    performances.append({
+                        'group_name':     row.group,
+                        'home_city':      row.home_city,
+                        'classification': classification or 'Unknown',
+                        'block_number':   block,
+                        'total_score':    getattr(row, 'subtotal_total', 0.0),
+                        'placement':      _place_to_int(getattr(row, 'subtotal_place', 0)),
+                        'penalty':        getattr(row, 'timing_penalty',  0.0),
+                        'caption_scores': caps,
+                    })
+
+    return {
+        'pdf_name':     fn,
+        'show_name':    show_name,
+        'show_date':    show_date,
+        'city':         city,
+        'state':        state,
+        'performances': performances,
+    }
+
+def _parse_one(pdf_path: str) -> dict:
+    """Pool-friendly wrapper: returns an error dict instead of raising."""
+    try:
+        return parse_pdf(pdf_path)
+    except Exception as e:
+        return {'pdf_name': os.path.basename(pdf_path), 'error': str(e)}
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 7) Persist one parsed PDF (runs only in the main process)
+# ─────────────────────────────────────────────────────────────────────────────
+def _persist(session: Session, parsed: dict, existing_shows: dict = None):
+    """
+    existing_shows, when given, is a {pdf_name: Show} preload shared across
+    the batch so re-ingest existence checks don't each issue a SELECT.
+    """
+    fn        = parsed['pdf_name']
+    show_name = parsed['show_name']
+    show_date = parsed['show_date']
 
-    # 3) Upsert Season
-    season = get_or_create(session, Season, year=show_date.year)
+    # 1) Upsert Season
+    season = get_or_create_cached(session, Season, year=show_date.year)
 
-    # 4) Upsert HostLocation
-    host = get_or_create(
+    # 2) Upsert HostLocation
+    host = get_or_create_cached(
         session, HostLocation,
         name  = show_name.rsplit(" ",1)[0],  # e.g. "Arcadia HS"
-        city  = city,
-        state = state
-    )
-
-    # 5) Compute week
-    week_num = (
-        session.query(Show)
-               .filter(Show.season_id == season.id, Show.date < show_date)
-               .count()
-        + 1
+        city  = parsed['city'],
+        state = parsed['state']
     )
 
-    # 6) Upsert (or update) Show by pdf_name
-    show = session.query(Show).filter_by(pdf_name=fn).one_or_none()
+    # 3) Upsert (or update) Show by pdf_name
+    #    (week is assigned in one pass after the whole batch — see main)
+    if existing_shows is not None:
+        show = existing_shows.get(fn)
+    else:
+        show = session.scalars(select(Show).where(Show.pdf_name == fn)).one_or_none()
     if show:
         show.name      = show_name
         show.date      = show_date
         show.season_id = season.id
         show.host_id   = host.id
-        show.week      = week_num
     else:
         show = Show(
             season_id = season.id,
             name      = show_name,
             date      = show_date,
             host_id   = host.id,
-            week      = week_num,
+            week      = 0,
             pdf_name  = fn
         )
         session.add(show)
+        if existing_shows is not None:
+            existing_shows[fn] = show
     session.flush()
 
-    # 7) Clear old performances (overwrite mode)
+    # 4) Clear old performances (overwrite mode)
     if show.performances:
         show.performances.clear()
         session.flush()
 
-    # 8) Build caption → weight map
-    cw_map = {cw.caption: cw.weight for cw in season.caption_weights}
-
-    # 9) Extract and ingest each page/block
-    with pdfplumber.open(pdf_path) as pdf:
-        for page_no in range(len(pdf.pages)):
-            per_hdr = scan_pdf_header(pdf_path, page_no=page_no)
-            cls_txt = per_hdr.get("classification_text", "")
-            classification, block = parse_class_block(cls_txt)
-
-            tables = extract_tables(pdf_path, pages=str(page_no+1))
-            for table in tables:
-                df = clean_table(table.df)
-                df = split_caption_cells(df)
-
-                # — robust filtering of non-performance rows —
-                # a) must have both Group & Home City
-                df = df[df['Group'].notna() & df['Home City'].notna()]
-                # b) drop any rogue header row
-                df = df[df['Group'].str.strip().str.lower() != 'group']
-                # c) require a positive subtotal_total
-                df = df[df['subtotal_total'].apply(lambda x: isinstance(x, float) and x > 0)]
-
-                for row in df.to_dict(orient='records'):
-                    grp = get_or_create(
-                        session, Group,
-                        name      = row['Group'],
-                        home_city = row['Home City']
-                    )
-                    cls = get_or_create(
-                        session, Classification,
-                        name=classification or 'Unknown'
-                    )
+    # 5) Caption → weight map, cached on the Season instance (weights_map),
+    #    so a season's weights load once per run rather than once per PDF
+    cw_map = season.weights_map
+
+    # 6) Prefetch Group/Classification into in-memory caches so the row
+    #    loop never queries; new entries are batch-inserted below
+    group_cache = {(g.name, g.home_city): g.id for g in session.scalars(select(Group))}
+    class_cache = {c.name: c.id for c in session.scalars(select(Classification))}
+    pending_groups  = {}   # (name, home_city) -> insert dict
+    pending_classes = {}   # name -> insert dict
+
+    # 7) Build insert-ready rows (two-phase bulk insert below instead of
+    #    per-row add+flush)
+    perf_rows    = []   # dicts for a single executemany INSERT into performances
+    row_captions = []   # per-performance list of caption dicts, ids filled in later
+    for perf in parsed['performances']:
+        group_key = (perf['group_name'], perf['home_city'])
+        if group_key not in group_cache and group_key not in pending_groups:
+            pending_groups[group_key] = {
+                'name':      perf['group_name'],
+                'home_city': perf['home_city']
+            }
+        class_name = perf['classification']
+        if class_name not in class_cache and class_name not in pending_classes:
+            pending_classes[class_name] = {'name': class_name}
+
+        perf_rows.append({
+            'show_id':           show.id,
+            'group_key':         group_key,
+            'class_name':        class_name,
+            'block_number':      perf['block_number'],
+            'total_score':       perf['total_score'],
+            'placement':         perf['placement'],
+            'penalty':           perf['penalty']
+        })
+        row_captions.append([
+            dict(cs, weight=cw_map.get(cs['caption'], 0.0))
+            for cs in perf['caption_scores']
+        ])
+
+    # 8) Batch-insert any groups/classifications first seen in this PDF
+    #    and refresh the caches with their assigned ids
+    if pending_groups:
+        new_ids = session.scalars(
+            insert(Group).returning(Group.id, sort_by_parameter_order=True),
+            list(pending_groups.values())
+        ).all()
+        group_cache.update(zip(pending_groups, new_ids))
+    if pending_classes:
+        new_ids = session.scalars(
+            insert(Classification).returning(
+                Classification.id, sort_by_parameter_order=True
+            ),
+            list(pending_classes.values())
+        ).all()
+        class_cache.update(zip(pending_classes, new_ids))
+    for pr in perf_rows:
+        pr['group_id']          = group_cache[pr.pop('group_key')]
+        pr['classification_id'] = class_cache[pr.pop('class_name')]
+
+    # 9) Two bulk statements: one executemany INSERT for performances
+    #    (RETURNING the assigned ids), one for all their caption scores
+    if perf_rows:
+        perf_ids = session.scalars(
+            insert(Performance).returning(
+                Performance.id, sort_by_parameter_order=True
+            ),
+            perf_rows
+        ).all()
+        cs_rows = []
+        for perf_id, caps in zip(perf_ids, row_captions):
+            for cs in caps:
+                cs['performance_id'] = perf_id
+                cs_rows.append(cs)
+        session.execute(insert(CaptionScore), cs_rows)
+
+    # 10) Flush this PDF's work; the commit belongs to the caller so a
+    #     whole batch shares one transaction (savepoints isolate failures)
+    session.flush()
 
-                    perf = Performance(
-                        show_id           = show.id,
-                        group_id          = grp.id,
-                        classification_id = cls.id,
-                        block_number      = block,
-                        total_score       = row.get('subtotal_total', 0.0),
-                        placement         = row.get('subtotal_place',   0),
-                        penalty           = row.get('timing_penalty',  0.0)
-                    )
-                    session.add(perf)
-                    session.flush()
-
-                    for cap in ['Effect - Music', 'Effect - Visual', 'Music', 'Visual']:
-                        slug = cap.lower().replace(' ', '_').replace('-', '')
-                        cs = CaptionScore(
-                            performance = perf,
-                            caption     = cap,
-                            weight      = cw_map.get(cap, 0.0),
-                            comp_score  = row.get(f"{slug}_comp", 0.0),
-                            perf_score  = row.get(f"{slug}_perf", 0.0),
-                            placement   = row.get(f"{slug}_place", 0),
-                            judge_id    = None
-                        )
-                        session.add(cs)
-
-    # 10) Commit all changes for this PDF
-    session.commit()
+def ingest_pdf(session: Session, pdf_path: str):
+    """Parse and persist one PDF in-process (serial path)."""
+    _persist(session, parse_pdf(pdf_path))
 
 # ─────────────────────────────────────────────────────────────────────────────
-# 7) Main: batch ingest folder
+# 8) Main: batch ingest folder
 # ─────────────────────────────────────────────────────────────────────────────
 def main(folder: str, db_url: str="sqlite:///scoresdb.sqlite"):
     engine = create_engine(db_url)
+
+    if db_url.startswith("sqlite"):
+        # WAL + NORMAL keeps commit durability while dropping the per-commit
+        # fsync of the default DELETE journal; temp/cache pragmas keep sort
+        # and spill work in memory during bulk ingest
+        @event.listens_for(engine, "connect")
+        def _set_sqlite_pragmas(dbapi_conn, _):
+            # pysqlite's legacy transaction handling only emits BEGIN before
+            # DML, so our savepoints would otherwise run in autocommit and
+            # each RELEASE would commit durably mid-batch. Disable it and
+            # issue BEGIN ourselves (see the "begin" listener below).
+            dbapi_conn.isolation_level = None
+            cur = dbapi_conn.cursor()
+            cur.execute("PRAGMA journal_mode=WAL")
+            cur.execute("PRAGMA synchronous=NORMAL")
+            cur.execute("PRAGMA temp_store=MEMORY")
+            cur.execute("PRAGMA cache_size=-65536")
+            cur.close()
+
+        @event.listens_for(engine, "begin")
+        def _sqlite_begin(conn):
+            conn.exec_driver_sql("BEGIN")
+
     Base.metadata.create_all(engine)
     SessionLocal = sessionmaker(bind=engine)
     sess = SessionLocal()
 
-    for fn in sorted(os.listdir(folder)):
-        if not fn.lower().endswith(".pdf"):
-            continue
-        path = os.path.join(folder, fn)
-        try:
-            ingest_pdf(sess, path)
-        except Exception as e:
-            sess.rollback()
-            print(f"[ERROR] {fn}: {e}")
+    paths = [
+        os.path.join(folder, fn)
+        for fn in sorted(os.listdir(folder))
+        if fn.lower().endswith(".pdf")
+    ]
+
+    # One transaction for the whole batch; each PDF writes inside a savepoint
+    # so a bad file rolls back alone without losing the rest
+    with sess.begin():
+        # One SELECT for all existing shows instead of one check per PDF
+        existing_shows = {s.pdf_name: s for s in sess.scalars(select(Show))}
+
+        # Parse PDFs in parallel (CPU-bound camelot/pdfplumber work); only
+        # the persistence step below touches the session, keeping SQLite
+        # single-writer
+        with ProcessPoolExecutor() as executor:
+            for parsed in executor.map(_parse_one, paths):
+                if 'error' in parsed:
+                    print(f"[ERROR] {parsed['pdf_name']}: {parsed['error']}")
+                    continue
+                try:
+                    with sess.begin_nested():
+                        _persist(sess, parsed, existing_shows)
+                except Exception as e:
+                    # savepoint already rolled back; drop any show the
+                    # failed PDF had registered in the preload dict, and
+                    # clear cached ids that may have been rolled back too
+                    existing_shows.pop(parsed['pdf_name'], None)
+                    _goc_cache.clear()
+                    print(f"[ERROR] {parsed['pdf_name']}: {e}")
+
+        # Assign weeks in one pass over the whole table: ROW_NUMBER() per
+        # season ordered by date, so weeks stay consistent however PDFs
+        # were ordered
+        sess.execute(text(
+            "UPDATE shows SET week = ("
+            " SELECT rn FROM ("
+            "  SELECT id, ROW_NUMBER() OVER (PARTITION BY season_id ORDER BY date) AS rn"
+            "  FROM shows"
+            " ) ranked WHERE ranked.id = shows.id)"
+        ))
 
     sess.close()
 